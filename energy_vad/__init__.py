@@ -1,23 +1,115 @@
 """Simple energy-based voice activity detector."""
 
-import array
 import math
 import statistics
 from typing import List, Optional
 
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional; fall back to pure Python
+    np = None  # type: ignore[assignment]
+
+try:
+    import numba
+except ImportError:
+    # numba is optional; fall back to numpy or pure Python
+    numba = None  # type: ignore[assignment]
+
 _SAMPLE_RATE = 16000
 _SAMPLE_WIDTH = 2  # 16-bit
 
+_sqrt = math.sqrt
+
+if numba is not None:
+    # Explicit signatures compile the kernels at import instead of on the
+    # first chunk. np.frombuffer is read-only for bytes, writable otherwise.
+    _NUMBA_SUMS_SIGNATURES = [
+        numba.types.UniTuple(numba.int64, 2)(
+            numba.types.Array(numba.int16, 1, "C", readonly=readonly)
+        )
+        for readonly in (True, False)
+    ]
+
+    @numba.njit(_NUMBA_SUMS_SIGNATURES, cache=True, fastmath=True)
+    def _numba_sums(chunk_array):
+        """Return sum(x) and sum(x^2) of 16-bit samples."""
+        # int64 can't overflow: sum(x^2) <= n * 2^30.
+        # Independent accumulators let LLVM vectorize the loop.
+        sum_x0 = sum_x1 = sum_x2 = sum_x3 = np.int64(0)
+        sum_sq0 = sum_sq1 = sum_sq2 = sum_sq3 = np.int64(0)
+        num_samples = chunk_array.shape[0]
+        num_unrolled = num_samples - (num_samples % 4)
+        for i in range(0, num_unrolled, 4):
+            x0 = np.int64(chunk_array[i])
+            x1 = np.int64(chunk_array[i + 1])
+            x2 = np.int64(chunk_array[i + 2])
+            x3 = np.int64(chunk_array[i + 3])
+            sum_x0 += x0
+            sum_x1 += x1
+            sum_x2 += x2
+            sum_x3 += x3
+            sum_sq0 += x0 * x0
+            sum_sq1 += x1 * x1
+            sum_sq2 += x2 * x2
+            sum_sq3 += x3 * x3
+
+        for i in range(num_unrolled, num_samples):
+            x0 = np.int64(chunk_array[i])
+            sum_x0 += x0
+            sum_sq0 += x0 * x0
+
+        sum_x = sum_x0 + sum_x1 + sum_x2 + sum_x3
+        sum_sq = sum_sq0 + sum_sq1 + sum_sq2 + sum_sq3
+
+        return sum_x, sum_sq
+
+    @numba.njit(_NUMBA_SUMS_SIGNATURES, cache=True, fastmath=True)
+    def _numba_sums_240(chunk_array):
+        """Return sum(x) and sum(x^2) of exactly 240 16-bit samples."""
+        # Fixed length (the default) lets LLVM unroll without a tail loop
+        sum_x = np.int64(0)
+        sum_sq = np.int64(0)
+        for i in range(240):
+            x = np.int64(chunk_array[i])
+            sum_x += x
+            sum_sq += x * x
+
+        return sum_x, sum_sq
+
+else:
+    _numba_sums = None  # type: ignore[assignment]
+    _numba_sums_240 = None  # type: ignore[assignment]
+
 
 class EnergyVad:
     """Energy-based voice activity detector (VAD)."""
 
+    __slots__ = (
+        "samples_per_chunk",
+        "bytes_per_chunk",
+        "seconds_per_chunk",
+        "debias",
+        "calibrate_seconds",
+        "calibrate_zscore_threshold",
+        "_inv_n",
+        "_buf",
+        "_threshold",
+        "_threshold_sq",
+        "_calibrate_chunks",
+        "_calibrate_energies",
+        "_calibrate_count",
+        "_calibrate_mean",
+        "_calibrate_m2",
+    )
+
     def __init__(
         self,
         threshold: Optional[float] = None,
         samples_per_chunk: int = 240,
         calibrate_seconds: float = 0.5,
         calibrate_zscore_threshold: float = 1.0,
+        debias: bool = True,
     ) -> None:
         """
         Initialize VAD.
@@ -34,22 +126,66 @@ class EnergyVad:
         calibrate_zscore_threshold: float
             Only energies below this (median) z-score threshold will be used in
             calibration.
+        debias: bool
+            If True, energy is the RMS of the samples after the RMS is
+            subtracted from each one.
+            If False, plain RMS is used, which is faster but slightly less
+            robust to a DC offset. For audio centered on zero, this is about
+            1/sqrt(2) of the debiased energy, so a fixed threshold must be
+            scaled to match.
         """
         self.samples_per_chunk = samples_per_chunk
         self.bytes_per_chunk = self.samples_per_chunk * _SAMPLE_WIDTH
         self.seconds_per_chunk = self.samples_per_chunk / _SAMPLE_RATE
+        self._inv_n = 1.0 / self.samples_per_chunk
+
+        # Reused for every chunk by the numpy path to avoid allocating
+        self._buf = (
+            np.empty(self.samples_per_chunk, dtype=np.int64)
+            if (np is not None) and (_numba_sums is None)
+            else None
+        )
 
         self.threshold = threshold
+        self.debias = debias
 
         self.calibrate_seconds = calibrate_seconds
         self.calibrate_zscore_threshold = calibrate_zscore_threshold
-        self._calibrate_seconds_left = self.calibrate_seconds
-        self._calibrate_energies: List[float] = []
+
+        self._calibrate_chunks = self._get_calibrate_chunks()
+
+        # Filled in by index, since the number of chunks is known
+        self._calibrate_energies: List[float] = [0.0] * self._calibrate_chunks
+        self._calibrate_count = 0
+        self._calibrate_mean = 0.0
+        self._calibrate_m2 = 0.0
+
+    @property
+    def threshold(self) -> Optional[float]:
+        """Energy threshold, above which is considered speech."""
+        return self._threshold
+
+    @threshold.setter
+    def threshold(self, value: Optional[float]) -> None:
+        self._threshold = value
+
+        if value is None:
+            self._threshold_sq: Optional[float] = None
+        elif value < 0:
+            # Any energy is above a negative threshold
+            self._threshold_sq = -1.0
+        else:
+            self._threshold_sq = value * value
 
     def reset_calibration(self) -> None:
         """Reset threshold and calibration time."""
-        self._calibrate_seconds_left = self.calibrate_seconds
-        self._calibrate_energies.clear()
+        self._calibrate_chunks = self._get_calibrate_chunks()
+        if len(self._calibrate_energies) != self._calibrate_chunks:
+            self._calibrate_energies = [0.0] * self._calibrate_chunks
+
+        self._calibrate_count = 0
+        self._calibrate_mean = 0.0
+        self._calibrate_m2 = 0.0
         self.threshold = None
 
     def process_chunk(self, chunk: bytes) -> Optional[bool]:
@@ -71,36 +207,211 @@ class EnergyVad:
         if len(chunk) != self.bytes_per_chunk:
             raise ValueError(f"Chunk must be {self.bytes_per_chunk} bytes")
 
-        chunk_array = array.array("h", chunk)
+        # Local lookups are faster than attribute lookups
+        threshold_sq = self._threshold_sq
+        inv_n = self._inv_n
+        debias = self.debias
 
-        # Compute RMS
-        energy = -math.sqrt(sum(x**2 for x in chunk_array) / len(chunk_array))
-        debiased_energy = math.sqrt(
-            sum((x + energy) ** 2 for x in chunk_array) / len(chunk_array)
-        )
+        if np is None:
+            # Zero-copy view of the samples
+            samples = memoryview(chunk).cast("h")
+            sum_x = 0
+            sum_sq = 0
+            if debias:
+                for x in samples:
+                    sum_x += x
+                    sum_sq += x * x
+            else:
+                sum_sq = sum(x * x for x in samples)
+        elif _numba_sums is not None:
+            chunk_array = np.frombuffer(chunk, dtype="<i2")
+            if self.samples_per_chunk == 240:
+                sum_x, sum_sq = _numba_sums_240(chunk_array)
+            else:
+                sum_x, sum_sq = _numba_sums(chunk_array)
+        else:
+            chunk_array = self._buf
+            np.copyto(chunk_array, np.frombuffer(chunk, dtype="<i2"))
+            # Exact in int64: sum(x^2) <= n * 2^30
+            sum_x = int(chunk_array.sum()) if debias else 0
+            sum_sq = int(np.dot(chunk_array, chunk_array))
 
-        if self.threshold is None:
-            if self._calibrate_seconds_left <= 0:
-                # Enough energy values are available for calibration.
-                # Calculate median z-score to remove high-energy clicks.
-                median = statistics.median(self._calibrate_energies)
-                stdev = statistics.stdev(self._calibrate_energies)
-                z_score = [(x - median) / stdev for x in self._calibrate_energies]
-
-                # Filter outliers, but fall back to using all energies if
-                # everything gets filtered out.
-                energies = [
-                    x
-                    for i, x in enumerate(self._calibrate_energies)
-                    if z_score[i] < self.calibrate_zscore_threshold
-                ] or self._calibrate_energies
+        # Compute squared RMS
+        mean_sq = sum_sq * inv_n
+        energy_sq = mean_sq
+        if debias:
+            # mean((x - rms)^2) = mean(x^2) - 2*rms*mean(x) + rms^2
+            mean = sum_x * inv_n
+            energy_sq = max(0.0, (2 * mean_sq) - (2 * _sqrt(mean_sq) * mean))
 
-                self.threshold = statistics.mean(energies) + statistics.stdev(energies)
-            else:
-                self._calibrate_energies.append(debiased_energy)
-                self._calibrate_seconds_left -= self.seconds_per_chunk
+        if threshold_sq is None:
+            self._calibrate(_sqrt(energy_sq))
 
             # Calibrating
             return None
 
-        return debiased_energy > self.threshold
+        # Energy is non-negative, so compare squares instead of taking sqrt
+        return energy_sq > threshold_sq
+
+    def process_audio(self, audio: bytes) -> List[Optional[bool]]:
+        """
+        Process multiple chunks of audio at once.
+
+        Equivalent to calling process_chunk on each chunk, but energies are
+        computed for all chunks together when numpy is available.
+
+        Parameters
+        ----------
+        audio: bytes
+            16-bit mono PCM audio at 16Khz.
+            Any samples after the last complete chunk are ignored.
+
+        Returns
+        -------
+        list of bool, optional
+            Result of process_chunk for each complete chunk.
+        """
+        if np is None:
+            num_chunks = len(audio) // self.bytes_per_chunk
+            return [
+                self.process_chunk(audio[offset : offset + self.bytes_per_chunk])
+                for offset in range(
+                    0, num_chunks * self.bytes_per_chunk, self.bytes_per_chunk
+                )
+            ]
+
+        energy_sq = self._audio_energy_sq(audio)
+        num_calibrate = self._calibrate_batch(energy_sq)
+        results: List[Optional[bool]] = [None] * num_calibrate
+        if num_calibrate < len(energy_sq):
+            results.extend((energy_sq[num_calibrate:] > self._threshold_sq).tolist())
+
+        return results
+
+    def process_chunks(self, audio: bytes) -> "np.ndarray":
+        """
+        Process multiple chunks of audio at once, returning a numpy array.
+
+        Like process_audio, but requires numpy and leaves out the chunks that
+        were used for calibration.
+
+        Parameters
+        ----------
+        audio: bytes
+            16-bit mono PCM audio at 16Khz.
+            Any samples after the last complete chunk are ignored.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array with True where energy > threshold, for each
+            complete chunk after calibration.
+        """
+        if np is None:
+            raise ImportError("numpy is required for process_chunks")
+
+        energy_sq = self._audio_energy_sq(audio)
+        num_calibrate = self._calibrate_batch(energy_sq)
+        if num_calibrate >= len(energy_sq):
+            return np.zeros(0, dtype=bool)
+
+        return energy_sq[num_calibrate:] > self._threshold_sq
+
+    def _audio_energy_sq(self, audio: bytes) -> "np.ndarray":
+        """Compute squared energy of every complete chunk using numpy."""
+        num_chunks = len(audio) // self.bytes_per_chunk
+        audio_array = np.frombuffer(
+            audio, dtype="<i2", count=num_chunks * self.samples_per_chunk
+        ).reshape(num_chunks, self.samples_per_chunk)
+
+        # Compute squared RMS for every chunk, same as process_chunk.
+        # Accumulate in int64 without copying the int16 samples.
+        sum_sq = np.einsum("ij,ij->i", audio_array, audio_array, dtype=np.int64)
+        mean_sq = sum_sq * self._inv_n
+        energy_sq = mean_sq
+        if self.debias:
+            mean = audio_array.sum(axis=1, dtype=np.int64) * self._inv_n
+            energy_sq = np.maximum(0.0, (2 * mean_sq) - (2 * np.sqrt(mean_sq) * mean))
+
+        return energy_sq
+
+    def _get_calibrate_chunks(self) -> int:
+        """Number of chunks in calibrate_seconds, rounded up."""
+        # Count chunks instead of subtracting seconds to avoid rounding errors
+        calibrate_samples = round(self.calibrate_seconds * _SAMPLE_RATE)
+        return -(-calibrate_samples // self.samples_per_chunk)
+
+    def _calibrate_batch(self, energy_sq: "np.ndarray") -> int:
+        """Calibrate on leading squared energies, returning how many were used."""
+        chunk_idx = 0
+        while (self.threshold is None) and (chunk_idx < len(energy_sq)):
+            self._calibrate(_sqrt(energy_sq[chunk_idx]))
+            chunk_idx += 1
+
+        return chunk_idx
+
+    def _calibrate(self, energy: float) -> None:
+        """Use chunk energy for calibration, setting threshold when complete."""
+        if self._calibrate_count >= self._calibrate_chunks:
+            # Enough energy values are available for calibration.
+            if self._calibrate_count < 2:
+                raise statistics.StatisticsError(
+                    "At least two chunks are needed for calibration"
+                )
+
+            stdev = self._calibrate_stdev()
+            if stdev == 0:
+                # All energies are the same (e.g., digital silence), so there
+                # are no outliers to filter.
+                self.threshold = self._calibrate_mean
+                return
+
+            if np is not None:
+                self.threshold = self._calibrate_threshold_numpy(stdev)
+                return
+
+            # Calculate median z-score to remove high-energy clicks.
+            median = statistics.median(self._calibrate_energies)
+            z_score = [(x - median) / stdev for x in self._calibrate_energies]
+
+            # Filter outliers, but fall back to using all energies if
+            # too few are left.
+            energies = [
+                x
+                for i, x in enumerate(self._calibrate_energies)
+                if z_score[i] < self.calibrate_zscore_threshold
+            ]
+
+            if (len(energies) < 2) or (len(energies) == self._calibrate_count):
+                # Nothing filtered, so running statistics can be used
+                self.threshold = self._calibrate_mean + stdev
+            else:
+                self.threshold = statistics.mean(energies) + statistics.stdev(energies)
+        else:
+            self._calibrate_energies[self._calibrate_count] = energy
+
+            # Update running mean/variance (Welford)
+            self._calibrate_count += 1
+            delta = energy - self._calibrate_mean
+            self._calibrate_mean += delta / self._calibrate_count
+            self._calibrate_m2 += delta * (energy - self._calibrate_mean)
+
+    def _calibrate_stdev(self) -> float:
+        """Sample standard deviation of calibration energies."""
+        return _sqrt(self._calibrate_m2 / (self._calibrate_count - 1))
+
+    def _calibrate_threshold_numpy(self, stdev: float) -> float:
+        """Calculate threshold from calibration energies using numpy."""
+        energies = np.asarray(self._calibrate_energies)
+
+        # Calculate median z-score to remove high-energy clicks.
+        z_score = (energies - np.median(energies)) / stdev
+
+        # Filter outliers, but fall back to using all energies if
+        # too few are left.
+        kept_energies = energies[z_score < self.calibrate_zscore_threshold]
+        if (kept_energies.size < 2) or (kept_energies.size == energies.size):
+            # Nothing filtered, so running statistics can be used
+            return self._calibrate_mean + stdev
+
+        return float(kept_energies.mean() + kept_energies.std(ddof=1))
@@ -1,11 +1,15 @@
 """Tests for energy_vad."""
 
+import array
+import random
+import statistics
 import wave
 from pathlib import Path
 from typing import List
 
 import pytest
 
+import energy_vad
 from energy_vad import EnergyVad
 
 _DIR = Path(__file__).parent
@@ -21,9 +25,9 @@ def read_wav(file_name: str) -> bytes:
         return wav_file.readframes(wav_file.getnframes())
 
 
-def run_vad(audio: bytes) -> List[bool]:
+def run_vad(audio: bytes, **kwargs) -> List[bool]:
     """Run VAD on audio and return speech/silence for each chunk."""
-    vad = EnergyVad()
+    vad = EnergyVad(**kwargs)
     results = []
     offset = 0
     while (offset + vad.bytes_per_chunk) < len(audio):
@@ -52,8 +56,189 @@ def test_speech() -> None:
     assert any(v for v in is_speech)
 
 
+def test_no_debias() -> None:
+    """Test with plain RMS energy."""
+    is_speech = run_vad(read_wav("silence.wav"), debias=False)
+    assert (sum(is_speech) / len(is_speech)) < 0.1
+
+    is_speech = run_vad(read_wav("speech.wav"), debias=False)
+    assert any(v for v in is_speech)
+
+
+def test_process_audio() -> None:
+    """Test that process_audio matches process_chunk."""
+    audio = read_wav("speech.wav")
+    vad = EnergyVad()
+    num_chunks = len(audio) // vad.bytes_per_chunk
+    expected = [
+        vad.process_chunk(
+            audio[
+                chunk_idx * vad.bytes_per_chunk : (chunk_idx + 1) * vad.bytes_per_chunk
+            ]
+        )
+        for chunk_idx in range(num_chunks)
+    ]
+
+    vad = EnergyVad()
+    assert vad.process_audio(audio) == expected
+
+
+@pytest.mark.parametrize("debias", [True, False])
+def test_process_audio_threshold_boundary(debias: bool) -> None:
+    """Test that process_audio matches process_chunk at the threshold."""
+    pytest.importorskip("numpy")
+
+    rng = random.Random(1234)
+    vad = EnergyVad(calibrate_seconds=(2 * 240) / 16000, debias=debias)
+    for _ in range(200):
+        chunk = array.array(
+            "h", (rng.randint(-1000, 1000) for _ in range(vad.samples_per_chunk))
+        ).tobytes()
+
+        # Calibrating on copies of one chunk sets threshold to its energy
+        vad.reset_calibration()
+        vad.process_audio(chunk * 3)
+        assert vad.threshold is not None
+
+        assert vad.process_audio(chunk) == [vad.process_chunk(chunk)]
+
+
+def test_process_chunks() -> None:
+    """Test that process_chunks matches process_audio without calibration."""
+    pytest.importorskip("numpy")
+
+    audio = read_wav("speech.wav")
+    expected = [v for v in EnergyVad().process_audio(audio) if v is not None]
+    is_speech = EnergyVad().process_chunks(audio)
+
+    assert is_speech.dtype == bool
+    assert is_speech.tolist() == expected
+
+
+def test_threshold() -> None:
+    """Test manually set threshold."""
+    chunk = array.array("h", [100, -100] * 120).tobytes()
+
+    vad = EnergyVad(threshold=0)
+    assert vad.process_chunk(chunk)
+
+    vad.threshold = 1000
+    assert not vad.process_chunk(chunk)
+
+    vad.threshold = -1
+    assert vad.process_chunk(bytes(vad.bytes_per_chunk))
+
+
+def test_calibrate_chunks() -> None:
+    """Test number of chunks used for calibration."""
+    audio = read_wav("speech.wav")
+
+    # 0.5 seconds = 33.3 chunks, rounded up (+1 to set threshold)
+    assert EnergyVad().process_audio(audio).count(None) == 35
+
+    # 0.15 seconds = exactly 10 chunks (+1 to set threshold)
+    vad = EnergyVad(calibrate_seconds=0.15)
+    assert vad.process_audio(audio).count(None) == 11
+
+    # Reset uses the current calibrate_seconds
+    vad = EnergyVad()
+    vad.calibrate_seconds = 0.15
+    vad.reset_calibration()
+    assert vad.process_audio(audio).count(None) == 11
+
+
+def test_reset_calibration() -> None:
+    """Test that calibration can be repeated after a reset."""
+    audio = read_wav("speech.wav")
+    vad = EnergyVad()
+    is_speech = vad.process_audio(audio)
+    threshold = vad.threshold
+
+    vad.reset_calibration()
+    assert vad.threshold is None
+    assert vad.process_audio(audio) == is_speech
+    assert vad.threshold == threshold
+
+    # More calibration chunks than before the reset
+    vad.calibrate_seconds = 1.0
+    vad.reset_calibration()
+    assert vad.process_audio(audio).count(None) == 68
+    assert vad.threshold is not None
+
+    # Fewer calibration chunks than before the reset
+    vad.calibrate_seconds = 0.15
+    vad.reset_calibration()
+    assert vad.process_audio(audio).count(None) == 11
+    assert vad.threshold is not None
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_calibrate_silence(monkeypatch, use_numpy: bool) -> None:
+    """Test calibration on digital silence, with and without numpy."""
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(energy_vad, "np", None)
+
+    vad = EnergyVad()
+    chunk = bytes(vad.bytes_per_chunk)
+    while vad.process_chunk(chunk) is None:
+        pass
+
+    assert vad.threshold == 0.0
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_calibrate_too_few_chunks(monkeypatch, use_numpy: bool) -> None:
+    """Test that calibration fails the same way with and without numpy."""
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(energy_vad, "np", None)
+
+    vad = EnergyVad(calibrate_seconds=0)
+    with pytest.raises(statistics.StatisticsError):
+        vad.process_chunk(bytes(vad.bytes_per_chunk))
+
+
 def test_bad_chunk_size() -> None:
     """Test chunk size requirement in process_chunk."""
     vad = EnergyVad()
     with pytest.raises(ValueError):
         vad.process_chunk(bytes(vad.bytes_per_chunk + 1))
+
+
+def test_numpy_matches_python(monkeypatch) -> None:
+    """Test that numpy and pure Python give the same results."""
+    pytest.importorskip("numpy")
+
+    audio = read_wav("speech.wav")
+    numpy_is_speech = run_vad(audio)
+
+    monkeypatch.setattr(energy_vad, "np", None)
+    python_is_speech = run_vad(audio)
+
+    assert numpy_is_speech == python_is_speech
+
+
+def test_numba_compiled_at_import() -> None:
+    """Test that numba kernels don't compile on the first chunk."""
+    pytest.importorskip("numba")
+
+    # pylint: disable=protected-access
+    assert energy_vad._numba_sums.signatures
+    assert energy_vad._numba_sums_240.signatures
+
+
+@pytest.mark.parametrize("samples_per_chunk", [240, 250])
+def test_numba_matches_numpy(monkeypatch, samples_per_chunk: int) -> None:
+    """Test that numba and numpy give the same results."""
+    pytest.importorskip("numba")
+
+    audio = read_wav("speech.wav")
+    numba_is_speech = run_vad(audio, samples_per_chunk=samples_per_chunk)
+
+    monkeypatch.setattr(energy_vad, "_numba_sums", None)
+    numpy_is_speech = run_vad(audio, samples_per_chunk=samples_per_chunk)
+
+    assert numba_is_speech == numpy_is_speech